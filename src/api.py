@@ -1,16 +1,24 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import asyncio
+import logging
+import os
 import uvicorn
 
+from section import Section
 from section_detector import SectionDetector
 
+logger = logging.getLogger("flint.api")
+
 app = FastAPI(
     title="Section Detector API",
     description="Detect visual sections in web pages using a browser-based analysis",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -22,8 +30,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize section detector
-detector = SectionDetector()
+# Initialize section detector; the browsers are the bottleneck, so run one per CPU (capped).
+# Set FLINT_USER_DATA_DIR to keep warm Chromium profiles across restarts.
+detector = SectionDetector(
+    num_browsers=min(os.cpu_count() or 1, 4),
+    user_data_dir=os.environ.get("FLINT_USER_DATA_DIR"),
+)
 
 
 class URLRequest(BaseModel):
@@ -34,11 +46,19 @@ class HTMLRequest(BaseModel):
     html: str
 
 
+# Upper bound on documents per batch request, to bound memory use
+MAX_BATCH_SIZE = 32
+
+
+class BatchHTMLRequest(BaseModel):
+    htmls: List[str] = Field(max_length=MAX_BATCH_SIZE)
+
+
 class SectionResponse(BaseModel):
     id: int
     type: str
     content: str
-    bounds: Dict[str, int]
+    bounds: Dict[str, float]
     metadata: Dict[str, Any]
     html: str
 
@@ -50,6 +70,18 @@ class DetectionResponse(BaseModel):
     timestamp: str
 
 
+def section_to_dict(section: Section) -> Dict[str, Any]:
+    """Build the SectionResponse-shaped dict for a section without model validation"""
+    return {
+        "id": section.id,
+        "type": section.type,
+        "content": section.content,
+        "bounds": section.bounds,
+        "metadata": section.metadata,
+        "html": section.get_html(),
+    }
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the section detector on startup"""
@@ -72,7 +104,7 @@ async def health_check():
     }
 
 
-@app.post("/api/detect-sections", response_model=DetectionResponse)
+@app.post("/api/detect-sections", responses={200: {"model": DetectionResponse}})
 async def detect_sections_from_url(request: URLRequest):
     """
     Detect sections from a live URL
@@ -84,36 +116,23 @@ async def detect_sections_from_url(request: URLRequest):
         DetectionResponse with detected sections
     """
     try:
-        print(f"Analyzing sections for URL: {request.url}")
+        logger.info("Analyzing sections for URL: %s", request.url)
 
         sections = await detector.detect_sections_from_url(request.url)
 
-        # Convert sections to response format
-        section_responses = []
-        for section in sections:
-            section_response = SectionResponse(
-                id=section.id,
-                type=section.type,
-                content=section.content,
-                bounds=section.bounds,
-                metadata=section.metadata,
-                html=section.get_html(),
-            )
-            section_responses.append(section_response)
-
-        return DetectionResponse(
-            url=request.url,
-            sections=section_responses,
-            total_sections=len(sections),
-            timestamp=datetime.now().isoformat(),
-        )
+        return {
+            "url": request.url,
+            "sections": [section_to_dict(section) for section in sections],
+            "total_sections": len(sections),
+            "timestamp": datetime.now().isoformat(),
+        }
 
     except Exception as e:
-        print(f"Error detecting sections: {str(e)}")
+        logger.error("Error detecting sections: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to detect sections: {str(e)}")
 
 
-@app.post("/api/analyze-html", response_model=DetectionResponse)
+@app.post("/api/analyze-html", responses={200: {"model": DetectionResponse}})
 async def analyze_html_content(request: HTMLRequest):
     """
     Analyze HTML content directly
@@ -125,34 +144,65 @@ async def analyze_html_content(request: HTMLRequest):
         DetectionResponse with detected sections
     """
     try:
-        print(f"Analyzing HTML content ({len(request.html)} characters)")
+        logger.info("Analyzing HTML content (%d characters)", len(request.html))
 
         sections = await detector.detect_sections(request.html)
 
-        # Convert sections to response format
-        section_responses = []
-        for section in sections:
-            section_response = SectionResponse(
-                id=section.id,
-                type=section.type,
-                content=section.content,
-                bounds=section.bounds,
-                metadata=section.metadata,
-                html=section.get_html(),
-            )
-            section_responses.append(section_response)
-
-        return DetectionResponse(
-            sections=section_responses,
-            total_sections=len(sections),
-            timestamp=datetime.now().isoformat(),
-        )
+        return {
+            "url": None,
+            "sections": [section_to_dict(section) for section in sections],
+            "total_sections": len(sections),
+            "timestamp": datetime.now().isoformat(),
+        }
 
     except Exception as e:
-        print(f"Error analyzing HTML: {str(e)}")
+        logger.error("Error analyzing HTML: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to analyze HTML: {str(e)}")
 
 
+@app.post("/api/analyze-html/batch", responses={200: {"model": List[DetectionResponse]}})
+async def analyze_html_batch(request: BatchHTMLRequest):
+    """
+    Analyze several HTML documents concurrently across the browser pool
+
+    Args:
+        request: BatchHTMLRequest containing up to MAX_BATCH_SIZE HTML documents
+
+    Returns:
+        List of DetectionResponse-shaped results, in request order
+    """
+    try:
+        logger.info("Analyzing batch of %d HTML documents", len(request.htmls))
+
+        results = await asyncio.gather(
+            *[detector.detect_sections(html) for html in request.htmls]
+        )
+
+        timestamp = datetime.now().isoformat()
+        return [
+            {
+                "url": None,
+                "sections": [section_to_dict(section) for section in sections],
+                "total_sections": len(sections),
+                "timestamp": timestamp,
+            }
+            for sections in results
+        ]
+
+    except Exception as e:
+        logger.error("Error analyzing HTML batch: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to analyze HTML batch: {str(e)}")
+
+
+@app.get("/api/cache-stats")
+async def get_cache_stats():
+    """Get hit-rate statistics for the HTML analysis cache"""
+    return {
+        "cache": detector.cache_stats(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
 @app.get("/api/stats")
 async def get_stats():
     """Get API statistics and endpoint information"""
@@ -160,6 +210,8 @@ async def get_stats():
         "endpoints": {
             "/api/detect-sections": "POST - Detect sections from URL",
             "/api/analyze-html": "POST - Analyze HTML content directly",
+            "/api/analyze-html/batch": "POST - Analyze several HTML documents at once",
+            "/api/cache-stats": "GET - HTML analysis cache statistics",
             "/health": "GET - Health check",
             "/api/stats": "GET - API statistics",
         },
@@ -169,4 +221,15 @@ async def get_stats():
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # A single worker process keeps one shared browser pool; concurrency comes from asyncio.
+    # Pin the C-accelerated event loop and HTTP parser rather than relying on auto-detection.
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        workers=1,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False,
+    )
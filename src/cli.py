@@ -115,8 +115,8 @@ Examples:
 
     args = parser.parse_args()
 
-    # Initialize detector
-    detector = SectionDetector()
+    # Initialize detector; a single analysis needs only one page
+    detector = SectionDetector(pages_per_browser=1)
 
     try:
         await detector.initialize()
@@ -1,5 +1,8 @@
-from typing import List, Dict, Any
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+
+# Indentation strings for the common nesting depths, built once
+_INDENTS = ["  " * level for level in range(32)]
 
 
 @dataclass
@@ -9,23 +12,28 @@ class Section:
     id: int
     type: str  # header, content, sidebar, footer, hero, etc.
     content: str  # text content
-    html_elements: List[str]  # original HTML elements
-    bounds: Dict[str, int]  # position and size
+    html_elements: List[str]  # element HTML, cleaned of scripts, styles and handlers
+    bounds: Dict[str, float]  # position and size
     metadata: Dict[str, Any]  # additional info
 
+    # Rendered HTML, built on first use; sections are not modified after detection
+    _html: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _clean_html: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
     def get_html(self) -> str:
         """Reconstruct the HTML for this section"""
-        if not self.html_elements:
-            return ""
-
-        # Create a proper HTML structure
-        html_parts = [f'<div class="section section-{self.type}" data-section-id="{self.id}">']
-        html_parts.extend(self.html_elements)
-        html_parts.append("</div>")
-        return "\n".join(html_parts)
+        if self._html is None:
+            self._html = self._build_html()
+        return self._html
 
     def get_clean_html(self) -> str:
         """Get HTML with proper indentation and structure"""
+        if self._clean_html is None:
+            self._clean_html = self._build_html(formatted=True)
+        return self._clean_html
+
+    def _build_html(self, formatted: bool = False) -> str:
+        """Wrap the section's elements in a container div"""
         if not self.html_elements:
             return ""
 
@@ -34,7 +42,9 @@ class Section:
         html_parts.extend(self.html_elements)
         html_parts.append("</div>")
 
-        return self._format_html(html_parts)
+        if formatted:
+            return self._format_html(html_parts)
+        return "\n".join(html_parts)
 
     def _format_html(self, elements: List[str]) -> str:
         """Format HTML with proper indentation"""
@@ -42,16 +52,20 @@ class Section:
         indent_level = 0
 
         for element in elements:
+            stripped = element.strip()
+
             # Simple indentation logic
-            if element.strip().startswith("</"):
+            if stripped.startswith("</"):
                 indent_level -= 1
 
-            formatted.append("  " * max(0, indent_level) + element.strip())
+            level = max(0, indent_level)
+            indent = _INDENTS[level] if level < len(_INDENTS) else "  " * level
+            formatted.append(indent + stripped)
 
             if (
-                element.strip().startswith("<")
-                and not element.strip().startswith("</")
-                and not element.strip().endswith("/>")
+                stripped.startswith("<")
+                and not stripped.startswith("</")
+                and not stripped.endswith("/>")
             ):
                 indent_level += 1
 
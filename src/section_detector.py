@@ -1,28 +1,382 @@
+import asyncio
+import hashlib
+import itertools
+import os
+import re
+from collections import OrderedDict
+from html.parser import HTMLParser
 from typing import List, Dict, Optional, Any
-from playwright.async_api import async_playwright, Browser, Page
+import numpy as np
+from lxml import etree
+from lxml import html as lxml_html
+from playwright.async_api import async_playwright, Browser, BrowserContext, Error, Page, Route
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from section import Section
 
+# Layout of the columnar payload returned by the page analysis script: each candidate
+# element contributes one row of _NUM_FIELDS numbers and one row of _STR_FIELDS strings
+_TOP, _LEFT, _WIDTH, _HEIGHT = 0, 1, 2, 3
+_MARGIN_TOP, _MARGIN_BOTTOM, _PADDING_TOP, _PADDING_BOTTOM = 4, 5, 6, 7
+_FLAGS = 8
+_PARENT = 9  # row of the nearest candidate ancestor, or -1
+_NUM_FIELDS = 10
+
+_OUTER_HTML, _TEXT, _BACKGROUND_COLOR, _BORDER_TOP, _BORDER_BOTTOM = range(5)
+_STR_FIELDS = 5
+
+# Bits of the _FLAGS column
+_HAS_IMAGES = 1
+_HAS_VIDEOS = 2
+
+# Installs window.__flintAnalyze, which collects the block-level containers that can
+# form sections with their computed styles and positions. Skipping inline and leaf
+# elements avoids a layout/style query per node. Filtering happens in the browser and
+# the result comes back as two flat columns (see the layout above), so only the
+# elements worth grouping cross the CDP pipe.
+_ANALYZER_JS = """
+window.__flintAnalyze = () => {
+    const numeric = [];
+    const strings = [];
+    const rows = new Map();
+    const candidates = document.querySelectorAll(
+        'section, article, header, footer, nav, main, aside, div, form'
+    );
+    for (const el of candidates) {
+        const rect = el.getBoundingClientRect();
+        if (rect.width < 80 || rect.height <= 50) continue;
+
+        const style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden') continue;
+
+        const textContent = el.textContent.trim();
+        const hasImages = el.querySelector('img') !== null;
+        const hasVideos = el.querySelector('video, iframe') !== null;
+        if (textContent.length < 10 && !hasImages && !hasVideos) continue;
+
+        // Candidates come in document order, so any kept ancestor already has a row
+        let ancestor = el.parentElement;
+        while (ancestor && !rows.has(ancestor)) ancestor = ancestor.parentElement;
+        rows.set(el, rows.size);
+
+        numeric.push(
+            rect.top,
+            rect.left,
+            rect.width,
+            rect.height,
+            parseInt(style.marginTop) || 0,
+            parseInt(style.marginBottom) || 0,
+            parseInt(style.paddingTop) || 0,
+            parseInt(style.paddingBottom) || 0,
+            (hasImages ? 1 : 0) | (hasVideos ? 2 : 0),
+            ancestor ? rows.get(ancestor) : -1
+        );
+        strings.push(
+            el.outerHTML,
+            textContent,
+            style.backgroundColor,
+            style.borderTop,
+            style.borderBottom
+        );
+    }
+    return { numeric, strings };
+};
+"""
+_CALL_ANALYZER_JS = "() => window.__flintAnalyze ? window.__flintAnalyze() : null"
+_RUN_ANALYZER_JS = "() => {" + _ANALYZER_JS + "return window.__flintAnalyze(); }"
+
+# Keywords used to classify sections, each set compiled into one pattern so the text
+# is scanned once per category
+_HEADER_KEYWORDS = re.compile("menu|nav|header|navigation")
+_FOOTER_KEYWORDS = re.compile("footer|copyright|privacy|terms")
+
+# Pooled pages per browser; concurrent requests beyond this wait for a free page
+_DEFAULT_PAGES_PER_BROWSER = min(os.cpu_count() or 1, 4)
+
+# Chromium flags that trim background work and start-up cost for headless analysis
+_BROWSER_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disk-cache-size=104857600",
+]
+
+# Image requests aborted when image blocking is enabled
+_IMAGE_URLS = "**/*.{png,jpg,jpeg,gif,webp,svg}"
+
+
+async def _abort_route(route: Route):
+    """Route handler that aborts the request"""
+    await route.abort()
+
+
+# Computed style values that mean an element draws no background or border
+_TRANSPARENT_BACKGROUNDS = frozenset(("rgba(0, 0, 0, 0)", "transparent"))
+_NO_BORDER = "0px none"
+
+# Characters lxml refuses to parse; browsers keep them in outerHTML (e.g. \x0b from pasted text)
+_XML_INVALID_CHARS = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+
+def _clean_element_html(fragment: str) -> str:
+    """Strip scripts, styles, comments and event handlers from outerHTML"""
+    try:
+        root = lxml_html.fragment_fromstring(
+            _XML_INVALID_CHARS.sub("", fragment), create_parent="div"
+        )
+    except (etree.ParserError, ValueError):
+        return fragment
+
+    etree.strip_elements(root, "script", "style", with_tail=False)
+    etree.strip_tags(root, etree.Comment)
+
+    # Whitespace is left alone: CSS white-space can make any element preformatted
+    for el in root.iter():
+        for name in [name for name in el.attrib if name.startswith("on")]:
+            del el.attrib[name]
+
+    return (root.text or "") + "".join(
+        lxml_html.tostring(child, encoding="unicode") for child in root
+    )
+
+
+# Tags that render nothing themselves, and tags whose text is never rendered. <template>
+# counts as content because a declarative shadow root renders it, and <script> because
+# it can build the body.
+_NON_CONTENT_TAGS = frozenset({"html", "head", "body", "meta", "link", "base"})
+_HIDDEN_TEXT_TAGS = frozenset({"title", "style", "noscript"})
+
+
+class _ContentFound(Exception):
+    """Raised to stop parsing as soon as renderable content is seen"""
+
+
+class _ContentProbe(HTMLParser):
+    """Scans HTML for the first element or text that would render in the body"""
+
+    def __init__(self):
+        super().__init__()
+        self._hidden_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _HIDDEN_TEXT_TAGS:
+            self._hidden_depth += 1
+        elif tag not in _NON_CONTENT_TAGS and not self._hidden_depth:
+            raise _ContentFound
+
+    def handle_endtag(self, tag):
+        if tag in _HIDDEN_TEXT_TAGS and self._hidden_depth:
+            self._hidden_depth -= 1
+
+    def handle_data(self, data):
+        if not self._hidden_depth and data.strip():
+            raise _ContentFound
+
+
+def _has_renderable_content(html_content: str) -> bool:
+    """Cheaply check whether a document has anything in its body a section could hold"""
+    probe = _ContentProbe()
+    try:
+        probe.feed(html_content)
+        probe.close()
+    except _ContentFound:
+        return True
+    return False
+
 
 class SectionDetector:
     """Detects visual sections in web pages using browser-based analysis"""
 
-    def __init__(self):
-        self.browser: Optional[Browser] = None
+    def __init__(
+        self,
+        num_browsers: int = 1,
+        pages_per_browser: int = _DEFAULT_PAGES_PER_BROWSER,
+        wait_until: str = "domcontentloaded",
+        navigation_timeout: float = 15000,
+        layout_timeout: float = 2000,
+        cache_size: int = 128,
+        user_data_dir: Optional[str] = None,
+        block_images: bool = False,
+    ):
+        """
+        Args:
+            num_browsers: Number of Chromium processes to spread requests across
+            pages_per_browser: Number of pre-warmed pages kept open in each browser
+            wait_until: Load state to wait for before analyzing; use "networkidle" for
+                pages whose sections depend on network-loaded content
+            navigation_timeout: Maximum time in milliseconds to wait for a URL to load
+            layout_timeout: Maximum time in milliseconds to wait for the body to lay out
+            cache_size: Number of HTML analysis results to keep (0 disables caching)
+            user_data_dir: Directory for persistent Chromium profiles, one per browser, so
+                the disk and V8 code caches survive restarts; pages then share a context,
+                and cookies and storage carry over between requests
+            block_images: Abort image requests; unsized images then lay out at their
+                broken-image size, which can shift section bounds
+        """
+        self.browsers: List[Browser] = []
         self.playwright: Optional[Any] = None
+        self.num_browsers = num_browsers
+        self.pages_per_browser = pages_per_browser
+        self.wait_until = wait_until
+        self.navigation_timeout = navigation_timeout
+        self.layout_timeout = layout_timeout
+        self.cache_size = cache_size
+        self.user_data_dir = user_data_dir
+        self.block_images = block_images
+        self._cache: OrderedDict[bytes, List[Section]] = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._pools: List[asyncio.Queue] = []
+        self._page_owners: Dict[Page, int] = {}
+        self._persistent_contexts: List[BrowserContext] = []
+        self._rr = itertools.cycle(range(num_browsers))
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._init_lock = asyncio.Lock()
 
     async def initialize(self):
-        """Initialize the browser for analysis"""
+        """Initialize the browsers and a pool of pre-warmed pages for analysis"""
         self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=True, args=["--no-sandbox", "--disable-setuid-sandbox"]
-        )
+        if self.user_data_dir:
+            # A profile directory can only be used by one browser process at a time
+            self._persistent_contexts = [
+                await self.playwright.chromium.launch_persistent_context(
+                    os.path.join(self.user_data_dir, str(index)),
+                    headless=True,
+                    args=_BROWSER_ARGS,
+                )
+                for index in range(self.num_browsers)
+            ]
+            for context in self._persistent_contexts:
+                await self._prepare_context(context)
+        else:
+            self.browsers = [
+                await self.playwright.chromium.launch(headless=True, args=_BROWSER_ARGS)
+                for _ in range(self.num_browsers)
+            ]
+
+        # Without a persistent profile each page gets its own context, which _release
+        # replaces after every request so requests never share browser state
+        self._pools = []
+        for index in range(self.num_browsers):
+            pool: asyncio.Queue = asyncio.Queue()
+            for _ in range(self.pages_per_browser):
+                pool.put_nowait(await self._new_page(index))
+            self._pools.append(pool)
+
+        self._sem = asyncio.Semaphore(self.num_browsers * self.pages_per_browser)
 
     async def close(self):
         """Clean up browser resources"""
-        if self.browser:
-            await self.browser.close()
+        if self._persistent_contexts:
+            # Closing a persistent context also shuts down its browser
+            for context in self._persistent_contexts:
+                await context.close()
+        else:
+            for page in self._page_owners:
+                await page.context.close()
+        self._persistent_contexts = []
+        self._page_owners = {}
+        self._pools = []
+        self._sem = None
+        for browser in self.browsers:
+            await browser.close()
+        self.browsers = []
         if self.playwright:
             await self.playwright.stop()
+            self.playwright = None
+
+    async def _prepare_context(self, context: BrowserContext):
+        """Install the page analyzer and request filters on a browser context"""
+        await context.add_init_script(_ANALYZER_JS)
+        if self.block_images:
+            await context.route(_IMAGE_URLS, _abort_route)
+
+    async def _new_page(self, index: int) -> Page:
+        """Open a page for the given browser and track it for cleanup"""
+        if self._persistent_contexts:
+            page = await self._persistent_contexts[index].new_page()
+        else:
+            context = await self.browsers[index].new_context()
+            await self._prepare_context(context)
+            page = await context.new_page()
+        self._page_owners[page] = index
+        return page
+
+    async def _discard_page(self, page: Page):
+        """Close a page that is no longer pooled, along with its context if it owns one"""
+        del self._page_owners[page]
+        try:
+            if self._persistent_contexts:
+                await page.close()
+            else:
+                await page.context.close()
+        except Error:
+            pass
+
+    async def _acquire(self) -> Page:
+        """Take a free page, spreading requests across browsers round-robin"""
+        if self._sem is None:
+            async with self._init_lock:
+                # Concurrent first calls must not each launch a set of browsers
+                if self._sem is None:
+                    await self.initialize()
+
+        if self._sem is None:
+            raise RuntimeError("Failed to initialize browser")
+
+        # One permit per pooled page, so holding a permit guarantees a free page somewhere
+        await self._sem.acquire()
+        start = next(self._rr)
+        for offset in range(self.num_browsers):
+            pool = self._pools[(start + offset) % self.num_browsers]
+            if not pool.empty():
+                return pool.get_nowait()
+
+        return await self._pools[start].get()
+
+    async def _release(self, page: Page):
+        """Hand a page back to its browser's pool, recycling its context between requests"""
+        if self._sem is None:
+            return
+
+        index = self._page_owners[page]
+        sem, pool = self._sem, self._pools[index]
+        try:
+            if self._persistent_contexts:
+                # Pages share the profile's context, so only the document is reset
+                await page.goto("about:blank")
+            else:
+                # Replacing the context keeps cookies, storage, caches and service
+                # workers from one request out of the next
+                stale, page = page, await self._new_page(index)
+                await self._discard_page(stale)
+        except Error:
+            # The page is unusable (e.g. crashed), swap in a fresh one if possible;
+            # otherwise keep it in the pool and retry on its next release
+            try:
+                fresh = await self._new_page(index)
+            except Error:
+                pass
+            else:
+                await self._discard_page(page)
+                page = fresh
+        finally:
+            # Always return the page and its permit, even if the caller was cancelled
+            pool.put_nowait(page)
+            sem.release()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Report how well the HTML analysis cache is doing"""
+        lookups = self._cache_hits + self._cache_misses
+        return {
+            "size": len(self._cache),
+            "capacity": self.cache_size,
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "hit_rate": self._cache_hits / lookups if lookups else 0.0,
+        }
 
     async def detect_sections(self, html_content: str) -> List[Section]:
         """
@@ -32,31 +386,45 @@ class SectionDetector:
             html_content: Raw HTML string to analyze
 
         Returns:
-            List of Section objects
+            List of Section objects; repeated HTML shares the cached Section objects, so
+            treat them as read-only
         """
-        if not self.browser:
-            await self.initialize()
+        # A document with nothing in its body has no sections; skip the browser entirely
+        if not _has_renderable_content(html_content):
+            return []
 
-        if self.browser is None:
-            raise RuntimeError("Failed to initialize browser")
+        # Identical HTML always yields the same sections, so serve repeats from the cache
+        key = hashlib.blake2b(html_content.encode(), digest_size=16).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._cache_hits += 1
+            # A new list, but the Section objects themselves are shared between callers
+            return list(cached)
+        self._cache_misses += 1
 
-        page = await self.browser.new_page()
+        page = await self._acquire()
 
         try:
             # Set the HTML content and wait for it to render
-            await page.set_content(html_content)
-            await page.wait_for_load_state("networkidle")
+            await page.set_content(html_content, wait_until=self.wait_until)
+            await self._wait_for_layout(page)
 
             # Analyze the page structure
             sections_data = await self._analyze_page_structure(page)
 
-            # Convert to Section objects
-            sections = self._create_section_objects(sections_data)
-
-            return sections
+            # Convert to Section objects (CPU-bound HTML cleanup, so off the event loop)
+            sections = await asyncio.to_thread(self._create_section_objects, sections_data)
 
         finally:
-            await page.close()
+            await self._release(page)
+
+        if self.cache_size > 0:
+            self._cache[key] = sections
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return list(sections)
 
     async def detect_sections_from_url(self, url: str) -> List[Section]:
         """
@@ -68,139 +436,109 @@ class SectionDetector:
         Returns:
             List of Section objects
         """
-        if not self.browser:
-            await self.initialize()
-
-        if self.browser is None:
-            raise RuntimeError("Failed to initialize browser")
-
-        page = await self.browser.new_page()
+        page = await self._acquire()
 
         try:
             # Navigate to the URL
-            await page.goto(url, wait_until="networkidle")
+            await page.goto(url, wait_until=self.wait_until, timeout=self.navigation_timeout)
+            await self._wait_for_layout(page)
 
             # Analyze the page structure
             sections_data = await self._analyze_page_structure(page)
 
-            # Convert to Section objects
-            sections = self._create_section_objects(sections_data)
+            # Convert to Section objects (CPU-bound HTML cleanup, so off the event loop)
+            sections = await asyncio.to_thread(self._create_section_objects, sections_data)
 
             return sections
 
         finally:
-            await page.close()
+            await self._release(page)
+
+    async def _wait_for_layout(self, page: Page):
+        """Wait, up to layout_timeout, for the body to have a rendered height"""
+        try:
+            await page.wait_for_function(
+                "document.body && "
+                "(document.body.offsetHeight > 0 || !document.body.firstElementChild)",
+                timeout=self.layout_timeout,
+            )
+        except PlaywrightTimeoutError:
+            # Analyze whatever has rendered so far
+            pass
 
     async def _analyze_page_structure(self, page: Page) -> List[Dict]:
         """Analyze the page structure to identify sections"""
 
-        # Get all elements with their computed styles and positions
-        elements_data = await page.evaluate(
-            """
-            () => {
-                const elements = document.querySelectorAll('*');
-                return Array.from(elements).map(el => {
-                    const rect = el.getBoundingClientRect();
-                    const style = window.getComputedStyle(el);
-                    
-                    return {
-                        tagName: el.tagName.toLowerCase(),
-                        textContent: el.textContent.trim(),
-                        outerHTML: el.outerHTML,
-                        rect: {
-                            top: rect.top,
-                            left: rect.left,
-                            width: rect.width,
-                            height: rect.height,
-                            bottom: rect.bottom,
-                            right: rect.right
-                        },
-                        styles: {
-                            backgroundColor: style.backgroundColor,
-                            marginTop: parseInt(style.marginTop),
-                            marginBottom: parseInt(style.marginBottom),
-                            paddingTop: parseInt(style.paddingTop),
-                            paddingBottom: parseInt(style.paddingBottom),
-                            borderTop: style.borderTop,
-                            borderBottom: style.borderBottom,
-                            display: style.display,
-                            visibility: style.visibility,
-                            position: style.position
-                        },
-                        hasImages: el.querySelector('img') !== null,
-                        hasVideos: el.querySelector('video, iframe') !== null
-                    };
-                }).filter(el =>
-                    el.rect.width > 50 &&
-                    el.rect.height > 50 &&
-                    el.styles.display !== 'none' &&
-                    el.styles.visibility !== 'hidden' &&
-                    (el.textContent.length > 0 || el.hasImages || el.hasVideos)
-                );
-            }
-        """
-        )
+        # The analyzer is installed on every document by an init script, so only a short
+        # call crosses the CDP pipe; fall back to sending the source if it is missing
+        elements_data = await page.evaluate(_CALL_ANALYZER_JS)
+        if elements_data is None:
+            elements_data = await page.evaluate(_RUN_ANALYZER_JS)
 
-        # Group elements into sections based on visual separation
-        sections = self._group_elements_into_sections(elements_data)
+        # Group elements into sections based on visual separation. This is CPU-bound, so
+        # run it in a worker thread to keep the event loop serving other requests.
+        sections = await asyncio.to_thread(self._group_elements_into_sections, elements_data)
 
         return sections
 
-    def _group_elements_into_sections(self, elements: List[Dict]) -> List[Dict]:
+    def _group_elements_into_sections(self, elements: Dict[str, List]) -> List[Dict]:
         """Group elements into sections based on visual separation"""
-        if not elements:
+        numeric = elements["numeric"]
+        strings = elements["strings"]
+        count = len(strings) // _STR_FIELDS
+        if not count:
             return []
 
-        # Filter out very small or insignificant elements first
-        significant_elements = []
-        for element in elements:
-            rect = element["rect"]
-
-            # Skip very small elements (likely decorative)
-            if rect["width"] < 80 or rect["height"] < 40:
-                continue
-
-            # Skip elements with very little content
-            if (
-                not element["textContent"].strip()
-                and not element["hasImages"]
-                and not element["hasVideos"]
-            ):
-                continue
-
-            # Skip elements that are likely just containers without meaningful content
-            if (
-                len(element["textContent"].strip()) < 10
-                and not element["hasImages"]
-                and not element["hasVideos"]
-            ):
-                continue
-
-            significant_elements.append(element)
-
-        if not significant_elements:
-            return []
+        # Per-element features don't depend on how earlier elements were grouped, so they
+        # are computed for the whole page at once; only the running section bounds need
+        # the sequential pass below
+        rows = np.asarray(numeric, dtype=np.float64).reshape(count, _NUM_FIELDS)
 
         # Sort elements by vertical position (top to bottom)
-        sorted_elements = sorted(significant_elements, key=lambda x: x["rect"]["top"])
+        order = np.argsort(rows[:, _TOP], kind="stable")
+        flags = rows[order, _FLAGS].astype(np.int64)
+        images_mask = (flags & _HAS_IMAGES) != 0
+        videos_mask = (flags & _HAS_VIDEOS) != 0
+
+        # Elements with styling that suggests a section boundary always start a new section
+        style_breaks = self._has_significant_styling(rows, strings)[order]
 
         sections = []
         current_section: Optional[Dict[str, Any]] = None
 
-        for element in sorted_elements:
-            rect = element["rect"]
+        # Page-wide record of markup already placed in a section: the outerHTML strings
+        # added so far, and the rows whose markup is contained in an added element
+        seen_html = set()
+        covered = set()
+
+        for index, has_images, has_videos, style_break in zip(
+            order.tolist(), images_mask.tolist(), videos_mask.tolist(), style_breaks.tolist()
+        ):
+            n = index * _NUM_FIELDS
+            top = numeric[n + _TOP]
+            left = numeric[n + _LEFT]
+            width = numeric[n + _WIDTH]
+            height = numeric[n + _HEIGHT]
+            element_html = strings[index * _STR_FIELDS + _OUTER_HTML]
+            text = strings[index * _STR_FIELDS + _TEXT]
+
+            # Skip exact duplicates and descendants of added elements, whose outerHTML is
+            # already part of a section
+            if element_html in seen_html or int(numeric[n + _PARENT]) in covered:
+                covered.add(index)
+                continue
 
             # Check if this element should start a new section
             should_start_new_section = False
 
-            if current_section is None:
+            if current_section is None or style_break:
                 should_start_new_section = True
             else:
                 # Check for significant vertical gap (whitespace)
                 current_bottom = (
                     current_section["bounds"]["top"] + current_section["bounds"]["height"]
                 )
-                gap = rect["top"] - current_bottom
+                gap = top - current_bottom
 
                 # Start new section if there's significant gap (> 100px) or if element is very different
                 if gap > 100:
@@ -210,105 +548,76 @@ class SectionDetector:
                     current_center = (
                         current_section["bounds"]["left"] + current_section["bounds"]["width"] / 2
                     )
-                    element_center = rect["left"] + rect["width"] / 2
+                    element_center = left + width / 2
                     horizontal_distance = abs(current_center - element_center)
 
                     # If element is far from current section center, start new section
-                    if (
-                        horizontal_distance
-                        > max(rect["width"], current_section["bounds"]["width"]) * 0.4
-                    ):
+                    if horizontal_distance > max(width, current_section["bounds"]["width"]) * 0.4:
                         should_start_new_section = True
 
                 # Also check if this element has significantly different content type
                 current_has_media = current_section["hasImages"] or current_section["hasVideos"]
-                element_has_media = element["hasImages"] or element["hasVideos"]
-
-                if current_has_media != element_has_media and (
-                    element["textContent"].strip() or element_has_media
-                ):
-                    should_start_new_section = True
+                element_has_media = has_images or has_videos
 
-                # Check for significant styling differences that suggest section boundaries
-                if self._has_significant_styling(element.get("styles", {})):
+                if current_has_media != element_has_media and (text or element_has_media):
                     should_start_new_section = True
 
             if should_start_new_section:
                 # Save current section if it has meaningful content
                 if current_section is not None and current_section.get("elementCount", 0) > 0:
                     # Only add sections with substantial content
-                    content = current_section.get("content", "")
-                    has_images = current_section.get("hasImages", False)
-                    has_videos = current_section.get("hasVideos", False)
-                    if len(content.strip()) > 30 or has_images or has_videos:
+                    content = " ".join(current_section["_content_parts"])
+                    if (
+                        len(content.strip()) > 30
+                        or current_section["hasImages"]
+                        or current_section["hasVideos"]
+                    ):
                         sections.append(current_section)
 
                 # Start new section
                 current_section = {
                     "id": len(sections) + 1,
                     "bounds": {
-                        "top": rect["top"],
-                        "left": rect["left"],
-                        "width": rect["width"],
-                        "height": rect["height"],
+                        "top": top,
+                        "left": left,
+                        "width": width,
+                        "height": height,
                     },
-                    "elements": [element["outerHTML"]],
+                    "elements": [element_html],
                     "elementCount": 1,
-                    "content": element["textContent"].strip(),
-                    "hasImages": element["hasImages"],
-                    "hasVideos": element["hasVideos"],
+                    "_content_parts": [text],
+                    "hasImages": has_images,
+                    "hasVideos": has_videos,
                 }
-            else:
-                # Add to current section
-                if current_section is not None:
-                    # Only add substantial elements
-                    if (
-                        rect["width"] > 80
-                        and rect["height"] > 40
-                        and (
-                            element["textContent"].strip()
-                            or element["hasImages"]
-                            or element["hasVideos"]
-                        )
-                    ):
-
-                        # Check if this element is already in the section to avoid duplicates
-                        element_html = element["outerHTML"]
-                        if element_html not in current_section["elements"]:
-                            current_section["elements"].append(element_html)
-                            current_section["elementCount"] += 1
-
-                            # Update section bounds to include this element
-                            current_section["bounds"]["top"] = min(
-                                current_section["bounds"]["top"], rect["top"]
-                            )
-                            current_section["bounds"]["left"] = min(
-                                current_section["bounds"]["left"], rect["left"]
-                            )
-                            current_section["bounds"]["width"] = max(
-                                current_section["bounds"]["width"],
-                                rect["left"] + rect["width"] - current_section["bounds"]["left"],
-                            )
-                            current_section["bounds"]["height"] = max(
-                                current_section["bounds"]["height"],
-                                rect["top"] + rect["height"] - current_section["bounds"]["top"],
-                            )
-
-                            # Update content
-                            if element["textContent"].strip():
-                                current_section["content"] += " " + element["textContent"].strip()
-                            current_section["hasImages"] = (
-                                current_section["hasImages"] or element["hasImages"]
-                            )
-                            current_section["hasVideos"] = (
-                                current_section["hasVideos"] or element["hasVideos"]
-                            )
+                seen_html.add(element_html)
+                covered.add(index)
+            elif current_section is not None:
+                # Add to current section; the page script already dropped elements without
+                # content, but only elements wider than 80px may join an existing section
+                if width > 80:
+                    seen_html.add(element_html)
+                    covered.add(index)
+                    current_section["elements"].append(element_html)
+                    current_section["elementCount"] += 1
+
+                    # Update section bounds to include this element
+                    bounds = current_section["bounds"]
+                    bounds["top"] = min(bounds["top"], top)
+                    bounds["left"] = min(bounds["left"], left)
+                    bounds["width"] = max(bounds["width"], left + width - bounds["left"])
+                    bounds["height"] = max(bounds["height"], top + height - bounds["top"])
+
+                    # Update content; fragments are joined once the section is complete
+                    if text:
+                        current_section["_content_parts"].append(text)
+                    current_section["hasImages"] = current_section["hasImages"] or has_images
+                    current_section["hasVideos"] = current_section["hasVideos"] or has_videos
 
         # Add final section
         if current_section is not None and current_section["elementCount"] > 0:
             # Only add sections with substantial content
             if (
-                len(current_section["content"].strip()) > 30
+                len(" ".join(current_section["_content_parts"]).strip()) > 30
                 or current_section["hasImages"]
                 or current_section["hasVideos"]
             ):
@@ -353,7 +662,7 @@ class SectionDetector:
                     # TODO: how to validly merge HTML elements?
                     merged_section["elements"] += next_section["elements"]
                     merged_section["elementCount"] = len(merged_section["elements"])
-                    merged_section["content"] += " " + next_section["content"]
+                    merged_section["_content_parts"].extend(next_section["_content_parts"])
                     merged_section["hasImages"] = (
                         merged_section["hasImages"] or next_section["hasImages"]
                     )
@@ -370,17 +679,15 @@ class SectionDetector:
 
         return merged
 
-    def _has_significant_styling(self, styles: Dict) -> bool:
-        """Detect if element has styling that suggests section separation"""
-        return (
-            styles["marginTop"] > 20
-            or styles["marginBottom"] > 20
-            or styles["paddingTop"] > 20
-            or styles["paddingBottom"] > 20
-            or styles["backgroundColor"] not in ["rgba(0, 0, 0, 0)", "transparent"]
-            or styles["borderTop"] != "0px none"
-            or styles["borderBottom"] != "0px none"
+    def _has_significant_styling(self, rows: np.ndarray, strings: List[str]) -> np.ndarray:
+        """Detect elements whose styling suggests section separation, as a mask over all rows"""
+        mask = (rows[:, _MARGIN_TOP : _PADDING_BOTTOM + 1] > 20).any(axis=1)
+        mask |= ~np.isin(
+            np.asarray(strings[_BACKGROUND_COLOR::_STR_FIELDS]), list(_TRANSPARENT_BACKGROUNDS)
         )
+        mask |= np.asarray(strings[_BORDER_TOP::_STR_FIELDS]) != _NO_BORDER
+        mask |= np.asarray(strings[_BORDER_BOTTOM::_STR_FIELDS]) != _NO_BORDER
+        return mask
 
     def _has_border_separator(self, styles: Dict) -> bool:
         """Detect border lines that indicate section separation"""
@@ -400,6 +707,8 @@ class SectionDetector:
         section_objects = []
 
         for i, section_data in enumerate(sections_data):
+            section_data["content"] = " ".join(section_data["_content_parts"])
+
             # Filter out sections that are too small or have no content
             if (
                 section_data["bounds"]["height"] < 30
@@ -416,7 +725,9 @@ class SectionDetector:
                 id=i + 1,
                 type=self._classify_section(section_data),
                 content=section_data["content"][:200],
-                html_elements=section_data["elements"],
+                html_elements=[
+                    _clean_element_html(element) for element in section_data["elements"]
+                ],
                 bounds=section_data["bounds"],
                 metadata={
                     "hasImages": section_data.get("hasImages", False),
@@ -434,13 +745,11 @@ class SectionDetector:
         bounds = section_data["bounds"]
 
         # Header detection
-        if bounds["top"] < 200 and any(
-            word in text for word in ["menu", "nav", "header", "navigation"]
-        ):
+        if bounds["top"] < 200 and _HEADER_KEYWORDS.search(text):
             return "header"
 
         # Footer detection
-        if any(word in text for word in ["footer", "copyright", "privacy", "terms"]):
+        if _FOOTER_KEYWORDS.search(text):
             return "footer"
 
         # Hero section detection
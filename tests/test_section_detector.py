@@ -1,173 +1,209 @@
-import sys
-from pathlib import Path
+import asyncio
 
-# flake8: noqa: E402
+import numpy as np
 import pytest
 import pytest_asyncio
 
-from section_detector import SectionDetector, Section
-
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
+from section_detector import (
+    SectionDetector,
+    Section,
+    _clean_element_html,
+    _has_renderable_content,
+)
+
+PAGE_HTML = """
+<!DOCTYPE html>
+<html>
+<head><title>Test</title></head>
+<body>
+    <header style="background: blue; padding: 20px;">
+        <h1>Test Header</h1>
+        <nav>Navigation</nav>
+    </header>
+    <main style="padding: 40px;">
+        <h2>Main Content</h2>
+        <p>This is the main content section with lots of text.</p>
+    </main>
+    <footer style="background: gray; padding: 20px;">
+        <p>Copyright 2024</p>
+    </footer>
+</body>
+</html>
+"""
+
+STYLED_DIV_HTML = """
+<!DOCTYPE html>
+<html>
+<body>
+    <div style="padding: 20px; background: red;">
+        <h1>Test Section</h1>
+        <p>This is a test section.</p>
+    </div>
+</body>
+</html>
+"""
+
+CLASSIFICATION_HTML = """
+<!DOCTYPE html>
+<html>
+<body>
+    <header style="padding: 20px;">
+        <h1>Header</h1>
+        <nav>Navigation</nav>
+    </header>
+    <section style="padding: 40px; height: 400px;">
+        <h2>Hero Section</h2>
+        <img src="hero.jpg" alt="Hero">
+    </section>
+    <aside style="width: 200px; height: 600px;">
+        <h3>Sidebar</h3>
+        <ul><li>Link 1</li></ul>
+    </aside>
+    <footer style="padding: 20px;">
+        <p>Copyright 2024</p>
+    </footer>
+</body>
+</html>
+"""
+
+# Covers both metadata and bounds; the bounds-only variant differed just by the image
+DIV_WITH_IMAGE_HTML = """
+<!DOCTYPE html>
+<html>
+<body>
+    <div style="padding: 20px;">
+        <h1>Test Section</h1>
+        <p>This is a test section with an image.</p>
+        <img src="test.jpg" alt="Test">
+    </div>
+</body>
+</html>
+"""
+
+COMPLEX_LAYOUT_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        .header { background: blue; padding: 20px; }
+        .hero { background: gray; padding: 40px; height: 300px; }
+        .content { padding: 20px; }
+        .sidebar { width: 200px; height: 500px; background: lightgray; }
+        .footer { background: darkgray; padding: 20px; }
+    </style>
+</head>
+<body>
+    <header class="header">
+        <h1>Header</h1>
+        <nav>Navigation</nav>
+    </header>
+    <section class="hero">
+        <h2>Hero Section</h2>
+        <img src="hero.jpg" alt="Hero">
+    </section>
+    <div style="display: flex;">
+        <main class="content">
+            <h3>Main Content</h3>
+            <p>This is the main content area with lots of text content.</p>
+        </main>
+        <aside class="sidebar">
+            <h4>Sidebar</h4>
+            <ul><li>Link 1</li><li>Link 2</li></ul>
+        </aside>
+    </div>
+    <footer class="footer">
+        <p>Copyright 2024</p>
+    </footer>
+</body>
+</html>
+"""
+
+EMPTY_HTML = "<!DOCTYPE html><html><body></body></html>"
+
+EXPECTED_SECTION_TYPES = frozenset({"header", "hero", "sidebar", "footer", "content", "section"})
+
+# Fields every detected section must carry
+REQUIRED_ATTRS = frozenset({"id", "type", "content", "bounds", "metadata", "html_elements"})
+REQUIRED_METADATA = frozenset({"hasImages", "hasVideos", "elementCount"})
+REQUIRED_BOUNDS = frozenset({"top", "left", "width", "height"})
+
+TRANSPARENT = "rgba(0, 0, 0, 0)"
+
+# (name, html, expectations beyond the invariants every section must satisfy)
+HTML_CASES = [
+    ("page", PAGE_HTML, {"non_empty": True, "multiple_types": True}),
+    ("styled_div", STYLED_DIV_HTML, {"non_empty": False, "multiple_types": False}),
+    ("classification", CLASSIFICATION_HTML, {"non_empty": False, "multiple_types": False}),
+    ("div_with_image", DIV_WITH_IMAGE_HTML, {"non_empty": False, "multiple_types": False}),
+    ("complex_layout", COMPLEX_LAYOUT_HTML, {"non_empty": True, "multiple_types": False}),
+]
+
+
+def analyzer_payload(*rows):
+    """Build the page script's columnar payload from (top, width, parent, html, background) rows"""
+    numeric, strings = [], []
+    for top, width, parent, html, background in rows:
+        numeric += [top, 0, width, 100, 0, 0, 0, 0, 0, parent]
+        text = f"Text long enough to make a section: {html}"
+        strings += [html, text, background, "0px none", "0px none"]
+    return {"numeric": numeric, "strings": strings}
+
+
+def grouped_elements(payload):
+    """Group a payload into sections and list the element HTML they hold"""
+    sections = SectionDetector()._group_elements_into_sections(payload)
+    return [html for section in sections for html in section["elements"]]
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def detector():
+    """Create a detector instance shared by every test in the module"""
+    detector = SectionDetector()
+    await detector.initialize()
+    yield detector
+    await detector.close()
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def all_results(detector):
+    """Detect sections for every HTML case concurrently, keyed by case name"""
+    results = await asyncio.gather(*[detector.detect_sections(html) for _, html, _ in HTML_CASES])
+    return {name: sections for (name, _, _), sections in zip(HTML_CASES, results)}
+
+
+# Share one event loop across the module so the detector fixture can outlive a test
+@pytest.mark.asyncio(loop_scope="module")
 class TestSectionDetector:
     """Test cases for the SectionDetector class"""
 
-    @pytest_asyncio.fixture
-    async def detector(self):
-        """Create a detector instance for testing"""
-        detector = SectionDetector()
-        await detector.initialize()
-        yield detector
-        await detector.close()
-
-    @pytest.mark.asyncio
-    async def test_detect_sections_from_html(self, detector):
-        """Test section detection from HTML content"""
-        html_content = """
-        <!DOCTYPE html>
-        <html>
-        <head><title>Test</title></head>
-        <body>
-            <header style="background: blue; padding: 20px;">
-                <h1>Test Header</h1>
-                <nav>Navigation</nav>
-            </header>
-            <main style="padding: 40px;">
-                <h2>Main Content</h2>
-                <p>This is the main content section with lots of text.</p>
-            </main>
-            <footer style="background: gray; padding: 20px;">
-                <p>Copyright 2024</p>
-            </footer>
-        </body>
-        </html>
-        """
-
-        sections = await detector.detect_sections(html_content)
-
-        assert len(sections) > 0
-        assert all(isinstance(section, Section) for section in sections)
-
-        # Check that we have different section types
-        section_types = [section.type for section in sections]
-        assert len(set(section_types)) > 1
-
-    @pytest.mark.asyncio
-    async def test_section_html_reconstruction(self, detector):
-        """Test that sections can reconstruct their HTML"""
-        html_content = """
-        <!DOCTYPE html>
-        <html>
-        <body>
-            <div style="padding: 20px; background: red;">
-                <h1>Test Section</h1>
-                <p>This is a test section.</p>
-            </div>
-        </body>
-        </html>
-        """
-
-        sections = await detector.detect_sections(html_content)
+    @pytest.mark.parametrize(
+        "name,expect",
+        [(name, expect) for name, _, expect in HTML_CASES],
+        ids=[case[0] for case in HTML_CASES],
+    )
+    async def test_invariants(self, all_results, name, expect):
+        """Test detection, classification, metadata, bounds and HTML of every section"""
+        sections = all_results[name]
 
-        for section in sections:
-            html = section.get_html()
-            assert html is not None
-            assert len(html) > 0
-            assert "<" in html  # Should contain HTML tags
-
-    @pytest.mark.asyncio
-    async def test_section_classification(self, detector):
-        """Test that sections are properly classified"""
-        html_content = """
-        <!DOCTYPE html>
-        <html>
-        <body>
-            <header style="padding: 20px;">
-                <h1>Header</h1>
-                <nav>Navigation</nav>
-            </header>
-            <section style="padding: 40px; height: 400px;">
-                <h2>Hero Section</h2>
-                <img src="hero.jpg" alt="Hero">
-            </section>
-            <aside style="width: 200px; height: 600px;">
-                <h3>Sidebar</h3>
-                <ul><li>Link 1</li></ul>
-            </aside>
-            <footer style="padding: 20px;">
-                <p>Copyright 2024</p>
-            </footer>
-        </body>
-        </html>
-        """
-
-        sections = await detector.detect_sections(html_content)
-
-        # Check that we have expected section types
-        section_types = [section.type for section in sections]
+        assert isinstance(sections, list)
+        if expect["non_empty"]:
+            assert len(sections) > 0, ("case", name)
 
         # Should have header, hero, sidebar, footer, or content sections
-        expected_types = ["header", "hero", "sidebar", "footer", "content", "section"]
-        for section_type in section_types:
-            assert section_type in expected_types
-
-    @pytest.mark.asyncio
-    async def test_section_metadata(self, detector):
-        """Test that sections have proper metadata"""
-        html_content = """
-        <!DOCTYPE html>
-        <html>
-        <body>
-            <div style="padding: 20px;">
-                <h1>Test Section</h1>
-                <p>This is a test section with an image.</p>
-                <img src="test.jpg" alt="Test">
-            </div>
-        </body>
-        </html>
-        """
-
-        sections = await detector.detect_sections(html_content)
+        section_types = {section.type for section in sections}
+        assert section_types <= EXPECTED_SECTION_TYPES, ("case", name, section_types)
+        if expect["multiple_types"]:
+            # Check that we have different section types
+            assert len(section_types) > 1, ("case", name, section_types)
 
         for section in sections:
-            assert hasattr(section, "id")
-            assert hasattr(section, "type")
-            assert hasattr(section, "content")
-            assert hasattr(section, "bounds")
-            assert hasattr(section, "metadata")
-            assert hasattr(section, "html_elements")
-
-            # Check metadata fields
-            assert "hasImages" in section.metadata
-            assert "hasVideos" in section.metadata
-            assert "elementCount" in section.metadata
-
-            # Check bounds
-            assert "top" in section.bounds
-            assert "left" in section.bounds
-            assert "width" in section.bounds
-            assert "height" in section.bounds
-
-    @pytest.mark.asyncio
-    async def test_section_bounds(self, detector):
-        """Test that sections have valid bounds"""
-        html_content = """
-        <!DOCTYPE html>
-        <html>
-        <body>
-            <div style="padding: 20px;">
-                <h1>Test Section</h1>
-                <p>This is a test section.</p>
-            </div>
-        </body>
-        </html>
-        """
-
-        sections = await detector.detect_sections(html_content)
+            assert isinstance(section, Section)
+            assert REQUIRED_ATTRS <= vars(section).keys()
 
-        for section in sections:
+            # Check metadata fields and bounds
+            assert REQUIRED_METADATA <= section.metadata.keys()
             bounds = section.bounds
+            assert REQUIRED_BOUNDS <= bounds.keys()
 
             # Bounds should be positive numbers
             assert bounds["top"] >= 0
@@ -175,64 +211,167 @@ class TestSectionDetector:
             assert bounds["width"] > 0
             assert bounds["height"] > 0
 
-    @pytest.mark.asyncio
+        # Sections can reconstruct their HTML; this uses the stored markup, not the browser
+        htmls = [section.get_html() for section in sections]
+        assert all("<" in html for html in htmls)  # Should contain HTML tags
+
     async def test_empty_html(self, detector):
         """Test handling of empty HTML"""
-        html_content = "<!DOCTYPE html><html><body></body></html>"
+        misses = detector.cache_stats()["misses"]
 
-        sections = await detector.detect_sections(html_content)
+        sections = await detector.detect_sections(EMPTY_HTML)
 
-        # Should handle empty HTML gracefully
-        assert isinstance(sections, list)
+        # Should handle empty HTML gracefully, without a browser round-trip
+        assert sections == []
+        assert detector.cache_stats()["misses"] == misses
+
+    async def test_repeated_html_served_from_cache(self, detector, all_results):
+        """Test that analyzing the same HTML again skips the browser round-trip"""
+        hits = detector.cache_stats()["hits"]
+
+        sections = await detector.detect_sections(DIV_WITH_IMAGE_HTML)
 
-    @pytest.mark.asyncio
-    async def test_complex_layout(self, detector):
+        assert detector.cache_stats()["hits"] == hits + 1
+        assert sections == all_results["div_with_image"]
+
+    async def test_cache_evicts_least_recently_used(self):
+        """Test that a full cache drops its oldest entry to make room"""
+        detector = SectionDetector(pages_per_browser=1, cache_size=1)
+        await detector.initialize()
+        try:
+            await detector.detect_sections(STYLED_DIV_HTML)
+            await detector.detect_sections(DIV_WITH_IMAGE_HTML)
+            await detector.detect_sections(DIV_WITH_IMAGE_HTML)
+            await detector.detect_sections(STYLED_DIV_HTML)
+            stats = detector.cache_stats()
+        finally:
+            await detector.close()
+
+        # The newest entry is served from the cache, the evicted one is analyzed again
+        assert stats["size"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 3
+
+    async def test_cache_disabled(self):
+        """Test that a cache size of 0 never stores results"""
+        detector = SectionDetector(pages_per_browser=1, cache_size=0)
+        await detector.initialize()
+        try:
+            await detector.detect_sections(STYLED_DIV_HTML)
+            await detector.detect_sections(STYLED_DIV_HTML)
+            stats = detector.cache_stats()
+        finally:
+            await detector.close()
+
+        assert stats["size"] == 0
+        assert stats["hits"] == 0
+        assert stats["misses"] == 2
+
+    async def test_complex_layout(self, all_results):
         """Test detection in complex layouts"""
-        html_content = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                .header { background: blue; padding: 20px; }
-                .hero { background: gray; padding: 40px; height: 300px; }
-                .content { padding: 20px; }
-                .sidebar { width: 200px; height: 500px; background: lightgray; }
-                .footer { background: darkgray; padding: 20px; }
-            </style>
-        </head>
-        <body>
-            <header class="header">
-                <h1>Header</h1>
-                <nav>Navigation</nav>
-            </header>
-            <section class="hero">
-                <h2>Hero Section</h2>
-                <img src="hero.jpg" alt="Hero">
-            </section>
-            <div style="display: flex;">
-                <main class="content">
-                    <h3>Main Content</h3>
-                    <p>This is the main content area with lots of text content.</p>
-                </main>
-                <aside class="sidebar">
-                    <h4>Sidebar</h4>
-                    <ul><li>Link 1</li><li>Link 2</li></ul>
-                </aside>
-            </div>
-            <footer class="footer">
-                <p>Copyright 2024</p>
-            </footer>
-        </body>
-        </html>
-        """
-
-        sections = await detector.detect_sections(html_content)
+        sections = all_results["complex_layout"]
 
         assert len(sections) > 0
 
         # Check that sections are ordered properly (top to bottom)
-        for i in range(len(sections) - 1):
-            assert sections[i].bounds["top"] <= sections[i + 1].bounds["top"]
+        tops = np.fromiter(
+            (section.bounds["top"] for section in sections), dtype=np.float64, count=len(sections)
+        )
+        steps = np.diff(tops)
+        assert np.all(steps >= 0), ("first out-of-order index", int(np.argmax(steps < 0)))
+
+
+class TestHasRenderableContent:
+    """Test cases for the scan that lets empty documents skip the browser"""
+
+    @pytest.mark.parametrize(
+        "html",
+        [
+            EMPTY_HTML,
+            "<html><head><title>Title</title><style>p { color: red; }</style></head></html>",
+            "<html><body><!-- nothing here --></body></html>",
+            "<html><body>\n  &nbsp; \n</body></html>",
+            "<html><body><noscript><p>Enable JavaScript</p></noscript></body></html>",
+        ],
+        ids=["empty", "head_only", "comment_only", "whitespace_only", "noscript_only"],
+    )
+    def test_documents_without_content(self, html):
+        """Test that documents with nothing to render are recognized"""
+        assert not _has_renderable_content(html)
+
+    @pytest.mark.parametrize(
+        "html",
+        [
+            "Just some text",
+            "<p>hi",
+            "<body><template>Shadow content</template></body>",
+            "<body><script>document.body.innerHTML = '<section>Built</section>'</script></body>",
+            "<head><script>addEventListener('load', build)</script></head><body></body>",
+        ],
+        ids=["bare_text", "unclosed_paragraph", "template", "script_only", "head_script"],
+    )
+    def test_documents_with_content(self, html):
+        """Test that any element or visible text sends the document to the browser"""
+        assert _has_renderable_content(html)
+
+
+class TestGroupElementsIntoSections:
+    """Test cases for how grouping avoids repeating markup across sections"""
+
+    def test_drops_exact_duplicate(self):
+        """Test that an element whose markup was already added is skipped"""
+        payload = analyzer_payload(
+            (0, 400, -1, "<div>Same</div>", TRANSPARENT),
+            (300, 400, -1, "<div>Same</div>", TRANSPARENT),
+        )
+
+        assert grouped_elements(payload) == ["<div>Same</div>"]
+
+    def test_drops_descendant_of_added_element(self):
+        """Test that an element inside an added element is not repeated"""
+        payload = analyzer_payload(
+            (0, 400, -1, "<div><p>Inner</p></div>", TRANSPARENT),
+            (20, 400, 0, "<p>Inner</p>", TRANSPARENT),
+        )
+
+        assert grouped_elements(payload) == ["<div><p>Inner</p></div>"]
+
+    def test_keeps_descendant_of_skipped_element(self):
+        """Test that an element inside one that was not added can still be added"""
+        payload = analyzer_payload(
+            (0, 400, -1, "<div>First</div>", TRANSPARENT),
+            # Too narrow to join the first section, so it is not added
+            (110, 80, -1, "<div><p>Inner</p></div>", TRANSPARENT),
+            # Its background starts a new section, which holds it
+            (120, 80, 1, "<p>Inner</p>", "rgb(1, 2, 3)"),
+        )
+
+        assert grouped_elements(payload) == ["<div>First</div>", "<p>Inner</p>"]
+
+
+class TestCleanElementHtml:
+    """Test cases for the cleanup applied to each section element's HTML"""
+
+    def test_strips_scripts_styles_comments_and_handlers(self):
+        """Test that non-rendering markup and inline event handlers are removed"""
+        html = (
+            '<div onclick="go()" class="a"><script>x()</script><style>p {}</style>'
+            "<!-- note --><p onmouseover=\"y()\">Text</p></div>"
+        )
+
+        assert _clean_element_html(html) == '<div class="a"><p>Text</p></div>'
+
+    def test_preserves_whitespace(self):
+        """Test that whitespace survives, since CSS can make any element preformatted"""
+        html = '<div>\n  Some\n\n  text <div style="white-space: pre">a\n   b</div>\n</div>'
+
+        assert _clean_element_html(html) == html
+
+    def test_drops_xml_invalid_characters(self):
+        """Test that control characters browsers keep in outerHTML do not break parsing"""
+        html = "<div>Pasted\x0btext\x1f from\ufffe Word</div>"
+
+        assert _clean_element_html(html) == "<div>Pastedtext from Word</div>"
 
 
 if __name__ == "__main__":